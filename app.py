@@ -1,40 +1,82 @@
-import autogen
-from autogen.agentchat.contrib.agent_builder import AgentBuilder
+import argparse
+import asyncio
+import hashlib
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+import orjson
 
-# Get API key from environment
-gemini_api_key = os.getenv('GEMINI_API_KEY')
+parser = argparse.ArgumentParser(description="AutoGen dynamic agent builder")
+parser.add_argument(
+    "--fresh",
+    action="store_true",
+    help="Ignore saved agent teams and design a new one for the task"
+)
+args = parser.parse_args()
 
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY not found in environment variables. Please check your .env file.")
+# Loads .env and validates GEMINI_API_KEY
+from config import LLM_CONFIG, MODEL_NAME
 
-# 1. Configuration
-config_list = [
-    {
-        'model': 'gemini-2.0-flash-exp',
-        'api_key': gemini_api_key,
-        'api_type': 'google'
-    }
-]
+# Heavy imports come after the key check so a missing key fails fast
+import autogen
+from autogen.agentchat.contrib.agent_builder import AgentBuilder
+from chat_utils import ConvergenceCheck, limit_chat_history
 
-llm_config = {
-    "config_list": config_list, 
-    "seed": 42,
-    "temperature": 0.7,
-    "timeout": 60
-}
+# 1. Configuration is shared with app_alternate.py through config.py
 
 # 2. Initialize AgentBuilder with proper configuration
 builder = AgentBuilder(
     config_file_or_env=None,
-    builder_model='gemini-2.0-flash-exp',
-    agent_model='gemini-2.0-flash-exp'
+    builder_model=MODEL_NAME,
+    agent_model=MODEL_NAME
 )
 
+# Agent teams built for earlier tasks, reused instead of redesigning them
+AGENT_LIBRARY_DIR = ".agent_lib"
+
+def agent_library_path(building_task):
+    """Path of the saved agent configuration for a task"""
+    task_hash = hashlib.sha256(building_task.encode("utf-8")).hexdigest()
+    return os.path.join(AGENT_LIBRARY_DIR, f"{task_hash}.json")
+
+def save_agent_configs(agent_configs, filename="agent_configs.json"):
+    """Save agent configurations to reuse later, without credentials"""
+    try:
+        # The LLM config is replaced with LLM_CONFIG on load, so keep the
+        # API key out of the saved file
+        saved_llm_config = {
+            key: value
+            for key, value in agent_configs.get("default_llm_config", {}).items()
+            if key not in ("config_list", "api_key")
+        }
+        saved_configs = {**agent_configs, "default_llm_config": saved_llm_config}
+        
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(saved_configs, option=orjson.OPT_INDENT_2))
+        print(f"Agent configurations saved to {filename}")
+    except Exception as e:
+        print(f"Could not save configurations: {e}")
+
+def load_agent_configs(filename):
+    """Load a saved team, using the current LLM_CONFIG instead of the saved one"""
+    with open(filename, 'rb') as f:
+        agent_configs = orjson.loads(f.read())
+    agent_configs["default_llm_config"] = LLM_CONFIG
+    return builder.load(config_json=orjson.dumps(agent_configs).decode("utf-8"))
+
+# The opening message is itself checked for termination, so agents learn how
+# to finish from their system messages instead
+FINAL_ANSWER_INSTRUCTION = """
+
+When the team's work is complete, reply with a line starting with
+"FINAL ANSWER:" followed by the final result."""
+
+def instruct_final_answer(agents):
+    """Tell every agent how to end the chat"""
+    for agent in agents:
+        agent.update_system_message(agent.system_message + FINAL_ANSWER_INSTRUCTION)
+
 # 3. Get task from user input
 print("=" * 60)
 print("AUTOGEN DYNAMIC AGENT BUILDER")
@@ -58,19 +100,33 @@ if not building_task:
 print(f"\nBuilding agents based on your task...")
 print(f"Task: {building_task}")
 
+library_path = agent_library_path(building_task)
+
 try:
-    # Build agents dynamically based on the task
-    agent_list, agent_configs = builder.build(
-        building_task=building_task,
-        default_llm_config=llm_config,
-        coding=True,  # Enable coding capabilities
-        library_path_or_json=None,  # Let it create fresh agents
-        max_agents=4  # Limit number of agents
-    )
+    agent_list = None
+    if not args.fresh and os.path.exists(library_path):
+        # Reuse the team designed for this task on a previous run
+        print(f"Loading saved agents from {library_path}")
+        try:
+            agent_list, agent_configs = load_agent_configs(library_path)
+        except Exception as e:
+            print(f"Could not load saved agents ({e}); building a new team")
+            builder.clear_all_agents()
+    
+    if agent_list is None:
+        # Build agents dynamically based on the task
+        agent_list, agent_configs = builder.build(
+            building_task=building_task,
+            default_llm_config=LLM_CONFIG,
+            coding=True,  # Enable coding capabilities
+            max_agents=4  # Limit number of agents
+        )
+        save_agent_configs(agent_configs, library_path)
     
     print(f"\nSuccessfully created {len(agent_list)} agents based on your task:")
     for i, agent in enumerate(agent_list):
         print(f"  {i+1}. {agent.name} - {agent.system_message[:100]}...")
+    instruct_final_answer(agent_list)
     
     # 4. Create multi-agent group chat with the dynamically created agents
     group_chat = autogen.GroupChat(
@@ -82,8 +138,10 @@ try:
     
     manager = autogen.GroupChatManager(
         groupchat=group_chat, 
-        llm_config=llm_config
+        llm_config=LLM_CONFIG,
+        is_termination_msg=ConvergenceCheck()
     )
+    limit_chat_history(agent_list)
     
     print("\nStarting multi-agent conversation...")
     
@@ -94,11 +152,11 @@ try:
     and potential applications in real-world domains.
     """
     
-    # Start the conversation
-    agent_list[0].initiate_chat(
+    # Start the conversation on AutoGen's async chat path
+    asyncio.run(agent_list[0].a_initiate_chat(
         manager, 
         message=conversation_starter
-    )
+    ))
     
 except Exception as e:
     print(f"Error during agent building: {e}")
@@ -117,11 +175,12 @@ except Exception as e:
         
         agent_list, agent_configs = builder.build(
             building_task=simple_task,
-            default_llm_config=llm_config,
+            default_llm_config=LLM_CONFIG,
             coding=False  # Disable coding if there are issues
         )
         
         print(f"Created {len(agent_list)} agents with simpler configuration")
+        instruct_final_answer(agent_list)
         
         group_chat = autogen.GroupChat(
             agents=agent_list,
@@ -131,28 +190,16 @@ except Exception as e:
         
         manager = autogen.GroupChatManager(
             groupchat=group_chat,
-            llm_config=llm_config
+            llm_config=LLM_CONFIG,
+            is_termination_msg=ConvergenceCheck()
         )
+        limit_chat_history(agent_list)
         
-        agent_list[0].initiate_chat(
+        asyncio.run(agent_list[0].a_initiate_chat(
             manager,
-            message="Find and analyze a recent AI research paper"
-        )
+            message="Find and analyze a recent AI research paper."
+        ))
         
     except Exception as e2:
         print(f"Second attempt also failed: {e2}")
         print("Please check your API key and model availability")
-
-# Optional: Save the agent configurations for reuse
-def save_agent_configs(agent_configs, filename="agent_configs.json"):
-    """Save agent configurations to reuse later"""
-    import json
-    try:
-        with open(filename, 'w') as f:
-            json.dump(agent_configs, f, indent=2)
-        print(f"Agent configurations saved to {filename}")
-    except Exception as e:
-        print(f"Could not save configurations: {e}")
-
-# Uncomment the line below if you want to save the agent configs
-# save_agent_configs(agent_configs)
\ No newline at end of file
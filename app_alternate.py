@@ -1,50 +1,20 @@
-import autogen
+import asyncio
+import hashlib
 import os
-import json
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Get API key from environment
-gemini_api_key = os.getenv('GEMINI_API_KEY')
-
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY not found in environment variables. Please check your .env file.")
+import time
+import orjson
 
-# Configuration
-config_list = [
-    {
-        'model': 'gemini-2.0-flash-exp',
-        'api_key': gemini_api_key,
-        'api_type': 'google'
-    }
-]
+# Loads .env and validates GEMINI_API_KEY
+from config import LLM_CONFIG
 
-llm_config = {
-    "config_list": config_list, 
-    "seed": 42,
-    "temperature": 0.7,
-    "timeout": 60
-}
+# Heavy imports come after the key check so a missing key fails fast
+import autogen
+import google.generativeai as genai
+import numpy as np
+from autogen.coding import LocalCommandLineCodeExecutor
+from chat_utils import ConvergenceCheck, is_final_answer, limit_chat_history
 
-class AutoAgentBuilder:
-    """
-    Custom AutoGen agent builder that uses LLM to automatically design agents
-    """
-    
-    def __init__(self, llm_config):
-        self.llm_config = llm_config
-        
-    def analyze_task_and_build_agents(self, task_description):
-        """
-        Use LLM to analyze task and automatically design appropriate agents
-        """
-        
-        # Create a temporary agent to analyze the task
-        task_analyzer = autogen.AssistantAgent(
-            name="TaskAnalyzer",
-            system_message="""You are an expert at analyzing tasks and designing multi-agent systems.
+TASK_ANALYZER_SYSTEM_MESSAGE = """You are an expert at analyzing tasks and designing multi-agent systems.
             
             When given a task, you must respond with ONLY a JSON object that defines the agents needed.
             
@@ -57,28 +27,102 @@ class AutoAgentBuilder:
                         "system_message": "Detailed system message for the agent",
                         "capabilities": ["capability1", "capability2"]
                     }
-                ]
+                ],
+                "coordinator": {
+                    "name": "TaskCoordinator",
+                    "role": "Overall coordination",
+                    "system_message": "Detailed system message for the coordinator"
+                }
             }
             
             Design 3-5 specialized agents that can work together to complete the task.
             Make sure each agent has a distinct role and expertise.
-            Include diverse capabilities like research, coding, analysis, writing, coordination.
-            DO NOT include any text outside the JSON object.""",
-            llm_config=self.llm_config
-        )
-        
-        # Create a simple user proxy to get the response
-        user_proxy = autogen.UserProxyAgent(
-            name="TempUser",
-            human_input_mode="NEVER",
-            max_consecutive_auto_reply=1,
-            code_execution_config=False
-        )
-        
-        print("🤖 Analyzing your task to design optimal agents...")
-        
-        # Get agent design from LLM
-        analysis_prompt = f"""
+            Include diverse capabilities like research, coding, analysis, writing.
+            Also design one coordinator that directs these agents, synthesizes their
+            results and keeps the team focused on the main objective.
+            DO NOT include any text outside the JSON object."""
+
+# Structured-output schema matching TASK_ANALYZER_SYSTEM_MESSAGE, so the
+# analyzer response is parseable JSON on the first try
+AGENT_SPECS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "agents": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "name": {"type": "STRING"},
+                    "role": {"type": "STRING"},
+                    "system_message": {"type": "STRING"},
+                    "capabilities": {"type": "ARRAY", "items": {"type": "STRING"}}
+                },
+                "required": ["name", "role", "system_message", "capabilities"]
+            }
+        },
+        "coordinator": {
+            "type": "OBJECT",
+            "properties": {
+                "name": {"type": "STRING"},
+                "role": {"type": "STRING"},
+                "system_message": {"type": "STRING"}
+            },
+            "required": ["name", "role", "system_message"]
+        }
+    },
+    "required": ["agents", "coordinator"]
+}
+
+# Capabilities that make an agent a code-executing UserProxyAgent
+CODING_CAPABILITIES = frozenset({
+    'coding', 'programming', 'development', 'scripting', 'codegen', 'execution'
+})
+
+# Embeds task descriptions for the similar-task spec cache
+TASK_EMBEDDING_MODEL = "models/text-embedding-004"
+
+# Used when the analyzer response does not include a coordinator
+DEFAULT_COORDINATOR_SPEC = {
+    "name": "TaskCoordinator",
+    "role": "Overall coordination",
+    "system_message": """Your responsibilities:
+            - Coordinate the work of all agents
+            - Ensure the task is completed efficiently
+            - Synthesize results from different agents
+            - Make final decisions and provide summaries
+            - Keep the team focused on the main objective
+            
+            Guide the conversation and ensure quality output."""
+}
+
+# Generic team used when the analyzer response cannot be used; built through
+# the same path as analyzer-designed teams
+FALLBACK_AGENT_SPECS = {
+    "agents": [
+        {
+            "name": "SupportAgent",
+            "role": "Support agent",
+            "system_message": "Provide assistance, analysis, and additional perspectives.",
+            "capabilities": ["analysis", "research"]
+        },
+        {
+            "name": "ExecutorAgent",
+            "role": "Implementation agent",
+            "system_message": "You execute code and handle practical implementation.",
+            "capabilities": ["execution"]
+        }
+    ],
+    "coordinator": {
+        "name": "PrimaryAgent",
+        "role": "Primary agent",
+        "system_message": "You are the primary agent responsible for the task. You should lead the effort and coordinate with other agents."
+    }
+}
+
+
+def build_analysis_prompt(task_description):
+    """Build the prompt asking the TaskAnalyzer to design a team for the task"""
+    return f"""
         Analyze this task and design a team of specialized agents to complete it:
         
         TASK: {task_description}
@@ -86,200 +130,650 @@ class AutoAgentBuilder:
         Design agents that can work together effectively. Consider what skills, knowledge, and capabilities are needed.
         Respond with ONLY the JSON object defining the agents.
         """
+
+
+def parse_agent_specs(response_text):
+    """Parse the analyzer's JSON-mode response into agent specifications"""
+    agent_specs = orjson.loads(response_text)
+    
+    if not agent_specs.get('agents'):
+        raise ValueError("Response does not define any agents")
+    
+    return agent_specs
+
+
+def chunk_text(chunk):
+    """Text of a streamed response chunk; empty for chunks without parts"""
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+class JSONObjectScanner:
+    """
+    Accumulate streamed text until the first top-level JSON object closes,
+    tracking brace depth outside of string literals
+    """
+    
+    def __init__(self):
+        self.parts = []
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text):
+        """Add a chunk of text; return True once the object is complete"""
+        start = 0
+        for i, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif not self.started:
+                if char == '{':
+                    self.started = True
+                    self.depth = 1
+                    start = i
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(text[start:i + 1])
+                    return True
+        
+        if self.started:
+            self.parts.append(text[start:])
+        return False
+    
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+
+def build_shared_prefix(task_description):
+    """
+    System-message prefix shared by every agent in a team. This only orders
+    the message; no prompt cache is created, since AutoGen's Gemini client
+    takes no CachedContent handle and the prefix is far below the minimum
+    cacheable size.
+    """
+    return f"""
+            TASK CONTEXT: {task_description}
+            
+            Work collaboratively with other agents to complete the overall task.
+            Be proactive, thorough, and provide high-quality output.
+            """
+
+
+# Agent-specific part of a team member's system message, after the shared prefix
+AGENT_ROLE_TEMPLATE = """
+            ROLE: {role}
+            
+            {system_message}
+            
+            Your capabilities include: {capabilities}
+            """
+
+COORDINATOR_ROLE_TEMPLATE = """
+            ROLE: {role}
+            
+            {system_message}
+            
+            When the team's output is complete, reply with a line starting
+            with "FINAL ANSWER:" followed by the final result.
+            """
+
+
+class LLMCache:
+    """
+    On-disk cache of parsed LLM responses, keyed by a hash of the request
+    """
+    
+    def __init__(self, cache_dir=".agent_cache", ttl_seconds=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def cache_key(model, messages, temperature, seed=None, tools=None):
+        """Hash everything that influences the response into a stable key"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "seed": seed,
+            "tools": tools
+        }
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key):
+        """Return the cached value for key, or None when missing or expired"""
+        path = self._path(key)
+        try:
+            if self.ttl_seconds is not None and time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                raise FileNotFoundError(path)
+            with open(path, "rb") as f:
+                value = orjson.loads(f.read())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return value
+    
+    def set(self, key, value):
+        """Store value under key, replacing the file atomically"""
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(value))
+        os.replace(tmp_path, path)
+    
+    def stats(self):
+        return f"cache hits: {self.hits}, misses: {self.misses}"
+
+
+class SemanticSpecCache:
+    """
+    Agent specs of previously designed tasks, looked up by cosine similarity
+    of task embeddings so differently worded but similar tasks reuse a design
+    """
+    
+    def __init__(self, path=os.path.join(".agent_cache", "semantic_index.json"),
+                 threshold=0.92, ttl_seconds=7 * 24 * 3600):
+        self.path = path
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.entries = []
+        self.embeddings = np.empty((0, 0))
+        self.hits = 0
+        self.misses = 0
+        
+        # Malformed and expired entries are dropped; an unreadable index
+        # starts out empty
+        try:
+            with open(path, "rb") as f:
+                entries = [e for e in orjson.loads(f.read()) if self._usable(e)]
+            if entries:
+                self.embeddings = np.vstack([self._normalize(e["embedding"]) for e in entries])
+            self.entries = entries
+        except (OSError, ValueError, TypeError):
+            self.entries = []
+            self.embeddings = np.empty((0, 0))
+    
+    def _usable(self, entry):
+        """True for a complete index entry that has not expired"""
+        if not isinstance(entry, dict) or not {"task", "embedding", "agent_specs"} <= entry.keys():
+            return False
+        return self.ttl_seconds is None or time.time() - entry.get("created", 0) <= self.ttl_seconds
+    
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+    
+    def lookup(self, embedding):
+        """Return (agent_specs, similarity) of the closest task above threshold, or (None, best)"""
+        if not self.entries:
+            self.misses += 1
+            return None, 0.0
+        
+        try:
+            similarities = self.embeddings @ self._normalize(embedding)
+        except ValueError:
+            # Index built with a different embedding model
+            self.misses += 1
+            return None, 0.0
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            return None, float(similarities[best])
+        
+        self.hits += 1
+        return self.entries[best]["agent_specs"], float(similarities[best])
+    
+    def stats(self):
+        return f"similar-task hits: {self.hits}, misses: {self.misses}"
+    
+    def add(self, task_description, embedding, agent_specs):
+        """Remember the specs designed for a task and persist the index"""
+        # Concurrent identical builds share one analyzer result; store it once
+        if any(entry["task"] == task_description for entry in self.entries):
+            return
+        
+        row = self._normalize(embedding)[np.newaxis, :]
+        if self.embeddings.size and self.embeddings.shape[1] != row.shape[1]:
+            # Embeddings from another model cannot be compared; start a new index
+            self.entries = []
+            self.embeddings = np.empty((0, 0))
+        
+        self.entries.append({
+            "task": task_description,
+            "embedding": list(map(float, embedding)),
+            "agent_specs": agent_specs,
+            "created": time.time()
+        })
+        self.embeddings = row if self.embeddings.size == 0 else np.vstack([self.embeddings, row])
+        
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(self.entries))
+        os.replace(tmp_path, self.path)
+
+class AutoAgentBuilder:
+    """
+    Custom AutoGen agent builder that uses LLM to automatically design agents
+    """
+    
+    def __init__(self, llm_config, cache=None, semantic_cache=None):
+        self.llm_config = llm_config
+        self.cache = cache if cache is not None else LLMCache()
+        self.semantic_cache = semantic_cache if semantic_cache is not None else SemanticSpecCache()
+        
+        # The TaskAnalyzer talks to Gemini directly; configure the SDK once
+        model_config = llm_config['config_list'][0]
+        genai.configure(api_key=model_config['api_key'])
+        self.model_name = model_config['model']
+        # Deterministic, schema-constrained output: parses on the first try
+        # and is safe to cache
+        self.analyzer_generation_config = {
+            "temperature": 0,
+            "response_mime_type": "application/json",
+            "response_schema": AGENT_SPECS_SCHEMA
+        }
+        # One code executor shared by every code-running agent the builder creates
+        self.code_executor = LocalCommandLineCodeExecutor(work_dir="agent_workspace", timeout=60)
+        
+        # One model handle (and its underlying client) reused for every build
+        self.task_analyzer = genai.GenerativeModel(
+            self.model_name,
+            system_instruction=TASK_ANALYZER_SYSTEM_MESSAGE,
+            generation_config=self.analyzer_generation_config
+        )
+    
+    def _run_analyzer_once(self, analysis_prompt):
+        """
+        Run one TaskAnalyzer completion and return only its text, so the
+        response object is released as soon as this returns.
+        The response is streamed and reading stops once the JSON object is
+        complete.
+        """
+        response = self.task_analyzer.generate_content(
+            analysis_prompt,
+            stream=True
+        )
         
-        # Start the conversation to get agent design
-        user_proxy.initiate_chat(
-            task_analyzer,
-            message=analysis_prompt,
-            max_turns=1
+        scanner = JSONObjectScanner()
+        for chunk in response:
+            if scanner.feed(chunk_text(chunk)):
+                break
+        return scanner.text
+    
+    def _analysis_cache_key(self, analysis_prompt):
+        """Cache key for the TaskAnalyzer request built from analysis_prompt"""
+        return LLMCache.cache_key(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": TASK_ANALYZER_SYSTEM_MESSAGE},
+                {"role": "user", "content": analysis_prompt}
+            ],
+            temperature=self.analyzer_generation_config['temperature'],
+            seed=self.llm_config.get('seed')
         )
+    
+    def _get_cached_specs(self, cache_key):
+        """Return cached agent specs for cache_key, logging the lookup"""
+        agent_specs = self.cache.get(cache_key)
+        if agent_specs is not None:
+            print(f"⚡ Reusing cached agent design ({self.cache.stats()})")
+        return agent_specs
+    
+    def _embed_task(self, task_description):
+        """Embedding of the task for the similar-task lookup, or None if unavailable"""
+        try:
+            return genai.embed_content(
+                model=TASK_EMBEDDING_MODEL,
+                content=task_description,
+                task_type="semantic_similarity"
+            )["embedding"]
+        except Exception as e:
+            print(f"⚠️  Skipping similar-task lookup: {e}")
+            return None
+    
+    def _get_similar_specs(self, task_embedding):
+        """Return agent specs designed for a similar task, logging the lookup"""
+        if task_embedding is None:
+            return None
+        
+        agent_specs, similarity = self.semantic_cache.lookup(task_embedding)
+        if agent_specs is not None:
+            print(f"⚡ Reusing agent design from a similar task (similarity {similarity:.2f})")
+        return agent_specs
+    
+    def _remember_specs(self, cache_key, task_description, task_embedding, agent_specs):
+        """Store freshly designed specs in the exact and similar-task caches"""
+        self.cache.set(cache_key, agent_specs)
+        if task_embedding is not None:
+            self.semantic_cache.add(task_description, task_embedding, agent_specs)
+        
+    def analyze_task_and_build_agents(self, task_description):
+        """
+        Use LLM to analyze task and automatically design appropriate agents
+        """
         
-        # Get the last message which should contain the JSON
-        last_message = user_proxy.chat_messages[task_analyzer][-1]["content"]
+        analysis_prompt = build_analysis_prompt(task_description)
+        cache_key = self._analysis_cache_key(analysis_prompt)
+        
+        agent_specs = self._get_cached_specs(cache_key)
+        if agent_specs is not None:
+            return self._create_agents_from_cached_specs(agent_specs, task_description)
+        
+        task_embedding = self._embed_task(task_description)
+        agent_specs = self._get_similar_specs(task_embedding)
+        if agent_specs is not None:
+            return self._create_agents_from_cached_specs(agent_specs, task_description)
+        
+        print("🤖 Analyzing your task to design optimal agents...")
+        
+        # One-shot completion; JSON mode means the text is the spec itself
+        last_message = self._run_analyzer_once(analysis_prompt)
         
         try:
-            # Extract JSON from the response
-            json_start = last_message.find('{')
-            json_end = last_message.rfind('}') + 1
-            
-            if json_start != -1 and json_end != -1:
-                json_str = last_message[json_start:json_end]
-                agent_specs = json.loads(json_str)
-                return self._create_agents_from_specs(agent_specs, task_description)
-            else:
-                raise ValueError("No valid JSON found in response")
+            agent_specs = parse_agent_specs(last_message)
+            agents = self._create_agents_from_specs(agent_specs, task_description)
                 
         except Exception as e:
             print(f"⚠️  Error parsing agent specifications: {e}")
             print("📝 LLM Response:", last_message)
             return self._create_fallback_agents(task_description)
+        
+        # Only cache specs that produced a team, so a bad design is not replayed
+        self._remember_specs(cache_key, task_description, task_embedding, agent_specs)
+        return agents
+    
+    def _create_agents_from_cached_specs(self, agent_specs, task_description):
+        """Create agents from cached specs, using the fallback team if they fail"""
+        try:
+            return self._create_agents_from_specs(agent_specs, task_description)
+        except Exception as e:
+            print(f"⚠️  Error building cached agent design: {e}")
+            return self._create_fallback_agents(task_description)
     
     def _create_agents_from_specs(self, agent_specs, task_description):
         """Create agents based on LLM specifications"""
         
-        agents = []
+        specs = agent_specs['agents']
+        coordinator_spec = agent_specs.get('coordinator') or DEFAULT_COORDINATOR_SPEC
         
-        print(f"🏗️  Building {len(agent_specs['agents'])} custom agents...")
+        # Same leading text for every agent; only the agent-specific part follows
+        shared_prefix = build_shared_prefix(task_description)
         
-        for spec in agent_specs['agents']:
-            # Enhance system message with task context
-            enhanced_system_message = f"""
-            TASK CONTEXT: {task_description}
-            
-            ROLE: {spec['role']}
-            
-            {spec['system_message']}
-            
-            Your capabilities include: {', '.join(spec.get('capabilities', []))}
-            
-            Work collaboratively with other agents to complete the overall task.
-            Be proactive, thorough, and provide high-quality output.
-            """
-            
-            # Determine if agent needs coding capabilities
-            needs_coding = any(cap.lower() in ['coding', 'programming', 'development', 'scripting'] 
-                             for cap in spec.get('capabilities', []))
-            
-            if needs_coding:
-                # Create as UserProxyAgent for code execution
-                agent = autogen.UserProxyAgent(
-                    name=spec['name'],
-                    human_input_mode="NEVER",
-                    max_consecutive_auto_reply=10,
-                    code_execution_config={
-                        "work_dir": "agent_workspace",
-                        "use_docker": False
-                    },
-                    system_message=enhanced_system_message
-                )
-            else:
-                # Create as AssistantAgent
-                agent = autogen.AssistantAgent(
-                    name=spec['name'],
-                    system_message=enhanced_system_message,
-                    llm_config=self.llm_config
-                )
-            
-            agents.append(agent)
+        print(f"🏗️  Building {len(specs)} custom agents...")
+        
+        # Always add a coordination agent, designed in the same analyzer call;
+        # it leads the list so it opens the chat
+        agents = [self._build_coordinator(coordinator_spec, shared_prefix)]
+        print(f"  ✓ Created {coordinator_spec['name']} - {coordinator_spec['role']}")
+        
+        for spec in specs:
+            agents.append(self._build_one(spec, shared_prefix))
             print(f"  ✓ Created {spec['name']} - {spec['role']}")
         
-        # Always add a coordination agent
-        coordinator = autogen.AssistantAgent(
-            name="TaskCoordinator",
-            system_message=f"""You are the task coordinator for: {task_description}
-            
-            Your responsibilities:
-            - Coordinate the work of all agents
-            - Ensure the task is completed efficiently
-            - Synthesize results from different agents
-            - Make final decisions and provide summaries
-            - Keep the team focused on the main objective
-            
-            Guide the conversation and ensure quality output.""",
-            llm_config=self.llm_config
+        return agents
+    
+    def _build_one(self, spec, shared_prefix):
+        """Create a single team member from its LLM specification"""
+        
+        capabilities = ', '.join(spec.get('capabilities', []))
+        
+        # Enhance system message with task context
+        enhanced_system_message = shared_prefix + AGENT_ROLE_TEMPLATE.format(
+            role=spec['role'],
+            system_message=spec['system_message'],
+            capabilities=capabilities
         )
-        agents.append(coordinator)
-        print(f"  ✓ Created TaskCoordinator - Overall coordination")
+        # Speaker selection lists every agent's description; keep it to the
+        # role so the shared task context is not repeated once per agent
+        description = f"{spec['role']} (capabilities: {capabilities})"
         
-        return agents
+        # Determine if agent needs coding capabilities
+        needs_coding = not CODING_CAPABILITIES.isdisjoint(
+            cap.lower() for cap in spec.get('capabilities', ())
+        )
+        
+        if needs_coding:
+            # Create as UserProxyAgent for code execution
+            return autogen.UserProxyAgent(
+                name=spec['name'],
+                human_input_mode="NEVER",
+                max_consecutive_auto_reply=10,
+                code_execution_config={"executor": self.code_executor},
+                system_message=enhanced_system_message,
+                description=description,
+                is_termination_msg=is_final_answer
+            )
+        
+        # Create as AssistantAgent
+        return autogen.AssistantAgent(
+            name=spec['name'],
+            system_message=enhanced_system_message,
+            description=description,
+            llm_config=self.llm_config,
+            is_termination_msg=is_final_answer
+        )
+    
+    def _build_coordinator(self, coordinator_spec, shared_prefix):
+        """Create the coordinator that directs the team and ends the chat"""
+        return autogen.AssistantAgent(
+            name=coordinator_spec['name'],
+            system_message=shared_prefix + COORDINATOR_ROLE_TEMPLATE.format(
+                role=coordinator_spec['role'],
+                system_message=coordinator_spec['system_message']
+            ),
+            description=coordinator_spec['role'],
+            llm_config=self.llm_config,
+            is_termination_msg=is_final_answer
+        )
     
     def _create_fallback_agents(self, task_description):
         """Create basic agents if LLM analysis fails"""
         
         print("🔄 Using fallback agent creation...")
         
-        agents = [
-            autogen.AssistantAgent(
-                name="PrimaryAgent",
-                system_message=f"You are the primary agent responsible for: {task_description}. You should lead the effort and coordinate with other agents.",
-                llm_config=self.llm_config
-            ),
-            autogen.AssistantAgent(
-                name="SupportAgent",
-                system_message=f"You are a support agent helping with: {task_description}. Provide assistance, analysis, and additional perspectives.",
-                llm_config=self.llm_config
-            ),
-            autogen.UserProxyAgent(
-                name="ExecutorAgent",
-                human_input_mode="NEVER",
-                max_consecutive_auto_reply=5,
-                code_execution_config={
-                    "work_dir": "workspace",
-                    "use_docker": False
-                },
-                system_message=f"You execute code and handle practical implementation for: {task_description}"
-            )
-        ]
+        return self._create_agents_from_specs(FALLBACK_AGENT_SPECS, task_description)
+
+
+class AsyncAutoAgentBuilder(AutoAgentBuilder):
+    """
+    AutoAgentBuilder variant that awaits the TaskAnalyzer request instead of
+    blocking on it, so several builds can run concurrently
+    """
+    
+    def __init__(self, llm_config, cache=None, semantic_cache=None):
+        super().__init__(llm_config, cache, semantic_cache)
+        # Analyzer requests in flight, by cache key, shared by identical builds
+        self._inflight = {}
+    
+    async def aanalyze_task_and_build_agents(self, task_description):
+        """
+        Async version of analyze_task_and_build_agents
+        """
         
+        analysis_prompt = build_analysis_prompt(task_description)
+        cache_key = self._analysis_cache_key(analysis_prompt)
+        
+        agent_specs = self._get_cached_specs(cache_key)
+        if agent_specs is not None:
+            return await self._acreate_agents(self._create_agents_from_cached_specs, agent_specs, task_description)
+        
+        task_embedding = await self._aembed_task(task_description)
+        agent_specs = self._get_similar_specs(task_embedding)
+        if agent_specs is not None:
+            return await self._acreate_agents(self._create_agents_from_cached_specs, agent_specs, task_description)
+        
+        print("🤖 Analyzing your task to design optimal agents...")
+        
+        last_message = await self._arun_analyzer_single_flight(cache_key, analysis_prompt)
+        
+        try:
+            agent_specs = parse_agent_specs(last_message)
+            agents = await self._acreate_agents(self._create_agents_from_specs, agent_specs, task_description)
+        
+        except Exception as e:
+            print(f"⚠️  Error parsing agent specifications: {e}")
+            print("📝 LLM Response:", last_message)
+            return await self._acreate_agents(self._create_fallback_agents, task_description)
+        
+        self._remember_specs(cache_key, task_description, task_embedding, agent_specs)
         return agents
+    
+    async def _aembed_task(self, task_description):
+        """Async version of _embed_task"""
+        try:
+            result = await genai.embed_content_async(
+                model=TASK_EMBEDDING_MODEL,
+                content=task_description,
+                task_type="semantic_similarity"
+            )
+            return result["embedding"]
+        except Exception as e:
+            print(f"⚠️  Skipping similar-task lookup: {e}")
+            return None
+    
+    async def _arun_analyzer_once(self, analysis_prompt):
+        """Async version of _run_analyzer_once"""
+        response = await self.task_analyzer.generate_content_async(
+            analysis_prompt,
+            stream=True
+        )
+        
+        scanner = JSONObjectScanner()
+        async for chunk in response:
+            if scanner.feed(chunk_text(chunk)):
+                break
+        return scanner.text
+    
+    async def _arun_analyzer_single_flight(self, cache_key, analysis_prompt):
+        """
+        Run the analyzer for cache_key once; concurrent identical builds
+        await the same request instead of sending their own
+        """
+        request = self._inflight.get(cache_key)
+        if request is None:
+            request = asyncio.ensure_future(self._arun_analyzer_once(analysis_prompt))
+            self._inflight[cache_key] = request
+            request.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        
+        # Shield so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(request)
+    
+    async def _acreate_agents(self, create_agents, *args):
+        """Run a sync agent-creation method off the event loop so other builds keep progressing"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, create_agents, *args)
+    
+    async def aanalyze_tasks(self, task_descriptions):
+        """Design and build one agent team per task, concurrently"""
+        return await asyncio.gather(
+            *(self.aanalyze_task_and_build_agents(task) for task in task_descriptions)
+        )
+
 
-# Get task from user input
-print("=" * 60)
-print("🚀 AUTOGEN INTELLIGENT AGENT BUILDER")
-print("=" * 60)
-print("This system uses AI to automatically design and create specialized agents")
-print("based on your specific task requirements.")
-print("\nThe system will:")
-print("• Analyze your task using AI")
-print("• Design optimal agent roles and capabilities")
-print("• Create specialized agents automatically")
-print("• Coordinate multi-agent collaboration")
-print("\nExamples of tasks:")
-print("- Find and analyze academic papers from arxiv")
-print("- Build a web application with user authentication")
-print("- Analyze datasets and create data visualizations")  
-print("- Scrape websites and generate content reports")
-print("- Create a trading bot for cryptocurrency")
-print("- Research and write a comprehensive report")
-print("-" * 60)
-
-building_task = input("\n📝 Please describe the task you want the agents to accomplish:\n> ").strip()
-
-if not building_task:
-    print("No task provided. Using default task...")
-    building_task = "Find a paper on arxiv by programming, and analyze its application in some domain."
-
-print(f"\n🎯 TASK: {building_task}")
-print("\n" + "="*60)
-
-try:
-    # Initialize our custom agent builder
-    builder = AutoAgentBuilder(llm_config)
-    
-    # Automatically design and create agents
-    agent_list = builder.analyze_task_and_build_agents(building_task)
-    
-    print(f"\n✅ Successfully created {len(agent_list)} specialized agents!")
-    print("\n🤖 Your AI-designed agent team:")
-    for i, agent in enumerate(agent_list):
-        print(f"  {i+1}. {agent.name}")
-    
-    # Create group chat with the automatically designed agents
-    group_chat = autogen.GroupChat(
-        agents=agent_list,
-        messages=[],
-        max_round=20,
-        speaker_selection_method="auto"
-    )
-    
-    manager = autogen.GroupChatManager(
-        groupchat=group_chat,
-        llm_config=llm_config
-    )
-    
-    print(f"\n🎬 Starting multi-agent collaboration...")
+async def main():
+    # Get task from user input
     print("=" * 60)
+    print("🚀 AUTOGEN INTELLIGENT AGENT BUILDER")
+    print("=" * 60)
+    print("This system uses AI to automatically design and create specialized agents")
+    print("based on your specific task requirements.")
+    print("\nThe system will:")
+    print("• Analyze your task using AI")
+    print("• Design optimal agent roles and capabilities")
+    print("• Create specialized agents automatically")
+    print("• Coordinate multi-agent collaboration")
+    print("\nExamples of tasks:")
+    print("- Find and analyze academic papers from arxiv")
+    print("- Build a web application with user authentication")
+    print("- Analyze datasets and create data visualizations")  
+    print("- Scrape websites and generate content reports")
+    print("- Create a trading bot for cryptocurrency")
+    print("- Research and write a comprehensive report")
+    print("-" * 60)
+
+    building_task = input("\n📝 Please describe the task you want the agents to accomplish:\n> ").strip()
+
+    if not building_task:
+        print("No task provided. Using default task...")
+        building_task = "Find a paper on arxiv by programming, and analyze its application in some domain."
+
+    print(f"\n🎯 TASK: {building_task}")
+    print("\n" + "="*60)
+
+    builder = None
+    try:
+        # Initialize our custom agent builder
+        builder = AsyncAutoAgentBuilder(LLM_CONFIG)
+    
+        # Automatically design and create agents
+        agent_list = await builder.aanalyze_task_and_build_agents(building_task)
+    
+        print(f"\n✅ Successfully created {len(agent_list)} specialized agents!")
+        print("\n🤖 Your AI-designed agent team:")
+        for i, agent in enumerate(agent_list):
+            print(f"  {i+1}. {agent.name}")
+    
+        # Create group chat with the automatically designed agents
+        group_chat = autogen.GroupChat(
+            agents=agent_list,
+            messages=[],
+            max_round=20,
+            speaker_selection_method="auto"
+        )
+    
+        manager = autogen.GroupChatManager(
+            groupchat=group_chat,
+            llm_config=LLM_CONFIG,
+            is_termination_msg=ConvergenceCheck()
+        )
+        limit_chat_history(agent_list)
+    
+        print(f"\n🎬 Starting multi-agent collaboration...")
+        print("=" * 60)
+    
+        # Start the conversation from the coordinator, which leads the list
+        await agent_list[0].a_initiate_chat(
+            manager,
+            message=f"Team, let's work together to complete this task: {building_task}\n\nPlease coordinate your efforts and deliver high-quality results."
+        )
     
-    # Start the conversation
-    agent_list[0].initiate_chat(
-        manager,
-        message=f"Team, let's work together to complete this task: {building_task}\n\nPlease coordinate your efforts and deliver high-quality results."
-    )
-    
-except Exception as e:
-    print(f"\n❌ Error during execution: {e}")
-    print("\nTroubleshooting tips:")
-    print("1. Check your API key is correct")
-    print("2. Verify internet connectivity") 
-    print("3. Ensure the Gemini API is accessible")
-    print("4. Try with a simpler task description")
\ No newline at end of file
+    except Exception as e:
+        print(f"\n❌ Error during execution: {e}")
+        print("\nTroubleshooting tips:")
+        print("1. Check your API key is correct")
+        print("2. Verify internet connectivity") 
+        print("3. Ensure the Gemini API is accessible")
+        print("4. Try with a simpler task description")
+    
+    finally:
+        # Reported on failures too, to show whether the design came from cache
+        if builder is not None:
+            print("=" * 60)
+            print(f"📊 Agent design {builder.cache.stats()}; {builder.semantic_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
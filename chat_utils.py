@@ -0,0 +1,67 @@
+import collections
+import hashlib
+
+from autogen.agentchat.contrib.capabilities import transform_messages, transforms
+
+
+def is_final_answer(message):
+    """True when a line of the message starts with FINAL ANSWER:"""
+    content = message.get("content")
+    return isinstance(content, str) and any(
+        line.lstrip().startswith("FINAL ANSWER:") for line in content.splitlines()
+    )
+
+
+class ConvergenceCheck:
+    """
+    is_termination_msg for the GroupChatManager: ends the chat on a FINAL
+    ANSWER, or once the last `window` messages repeat the `window` before them
+    """
+    
+    def __init__(self, window=3):
+        self.window = window
+        self.recent = collections.deque(maxlen=2 * window)
+    
+    def __call__(self, message):
+        if is_final_answer(message):
+            return True
+        
+        content = str(message.get("content"))
+        self.recent.append(hashlib.sha256(content.encode("utf-8")).hexdigest())
+        if len(self.recent) < self.recent.maxlen:
+            return False
+        
+        history = list(self.recent)
+        return history[:self.window] == history[self.window:]
+
+
+# Gemini models have no tiktoken encoding; count tokens with a GPT-4
+# tokenizer instead, which is close enough for a context budget
+TOKEN_COUNT_MODEL = "gpt-4"
+
+
+def limit_chat_history(agents):
+    """
+    Cap the history each LLM-backed agent sends per turn to the opening
+    request plus the latest messages, 8 in all and at most 1000 tokens
+    each, so prompt size stops growing with the number of rounds
+    """
+    history_transforms = [
+        # The opening message is the only place the request itself appears
+        transforms.MessageHistoryLimiter(max_messages=8, keep_first_message=True),
+        # Without a per-message cap the limiter keeps only the newest message.
+        # The total fits all 8, so only long messages are shortened and the
+        # opening message is never dropped here
+        transforms.MessageTokenLimiter(
+            max_tokens=8000, max_tokens_per_message=1000, model=TOKEN_COUNT_MODEL
+        )
+    ]
+    # Apply the transforms once here so a tokenizer problem fails at setup
+    # instead of on the first agent reply
+    for transform in history_transforms:
+        transform.apply_transform([{"role": "user", "content": "Sample message"}])
+    
+    context_handling = transform_messages.TransformMessages(transforms=history_transforms)
+    for agent in agents:
+        if agent.llm_config:
+            context_handling.add_to_agent(agent)
@@ -0,0 +1,33 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Get API key from environment
+gemini_api_key = os.getenv('GEMINI_API_KEY')
+
+if not gemini_api_key:
+    raise ValueError("GEMINI_API_KEY not found in environment variables. Please check your .env file.")
+
+MODEL_NAME = 'gemini-2.0-flash-exp'
+
+# Shared by both entry points. These stay plain dicts because AutoGen only
+# accepts a dict llm_config; treat them as read-only and copy before changing.
+CONFIG_LIST = [
+    {
+        'model': MODEL_NAME,
+        'api_key': gemini_api_key,
+        'api_type': 'google'
+    }
+]
+
+LLM_CONFIG = {
+    "config_list": CONFIG_LIST,
+    "seed": 42,
+    # AutoGen's on-disk response cache (.cache/42): identical requests from
+    # any agent are answered locally instead of calling the API again
+    "cache_seed": 42,
+    "temperature": 0.7,
+    "timeout": 60
+}